@@ -8,13 +8,16 @@ MAJOR: Breaking changes
 MINOR: New features, backward compatible
 PATCH: Bug fixes, backward compatible
 """
-try:
-    from importlib.metadata import version
-    __version__ = version("config-saver")
-except ImportError:
-    __version__ = "unknown"
-try:
-    from importlib.metadata import version
-    __version__ = version("config-saver")
-except ImportError:
-    __version__ = "unknown"
\ No newline at end of file
+
+
+def __getattr__(name: str) -> str:
+    """Resolve __version__ lazily (PEP 562) so commands that never print it skip the metadata lookup."""
+    if name == "__version__":
+        try:
+            from importlib.metadata import version
+            value = version("config-saver")
+        except ImportError:
+            value = "unknown"
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
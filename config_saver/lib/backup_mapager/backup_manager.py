@@ -1,14 +1,54 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import glob
+import contextlib
+import functools
 import os
-from typing import List, Optional
+import re
+import stat
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from colorama import Fore
+from tqdm import tqdm
 
-from config_saver.lib.parser.parser import Parser
-from config_saver.lib.tar_compressor.tar_compressor import TarCompressor
+from config_saver.lib.backup_mapager.backup_state import BackupState
+from config_saver.lib.tar_compressor.tar_compressor import (
+    ARCHIVE_EXT,
+    ARCHIVE_SUFFIXES,
+    DEFAULT_COMPRESSLEVEL,
+    TarCompressor,
+)
+
+# Timestamp directory names, as produced by strftime("%Y%m%d-%H%M%S")
+_is_timestamp_name = re.compile(r"\d{8}-\d{6}").fullmatch
+
+
+@functools.lru_cache(maxsize=None)
+def default_saves_dir() -> str:
+    """Return the default saves directory, ~/.config/config-saver (expanded once per process)."""
+    return os.path.expanduser("~/.config/config-saver")
+
+
+@functools.lru_cache(maxsize=None)
+def user_saves_dir() -> str:
+    """Return the fallback saves directory used when the default is not writable."""
+    return os.path.expanduser("~/.local/share/config-saver/saves")
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_description(archive_dir: str) -> Optional[str]:
+    """Return the stripped description.txt in archive_dir, or None if there is none.
+
+    Cached per directory: listing asks for the same descriptions repeatedly within
+    one invocation. Writers call _read_description.cache_clear().
+    """
+    try:
+        with open(os.path.join(archive_dir, "description.txt"), "r", encoding="utf-8") as fh:
+            return fh.read().strip()
+    except OSError:
+        # Missing, a directory, or unreadable
+        return None
 
 
 class BackupManager:
@@ -17,49 +57,242 @@ class BackupManager:
     Responsibilities:
     - ensure the saves directory exists (with XDG fallback)
     - list existing archives (prefer per-config 'configs' subdir)
-    - compress a single YAML-based configuration into a tar.gz
+    - compress a single YAML-based configuration into a tar.gz/tar.zst
     - compress every YAML in a directory into per-config archives
     """
 
     def __init__(self, saves_dir: Optional[str] = None):
-        self.saves_dir = saves_dir or os.path.expanduser("~/.config/config-saver")
+        self.saves_dir = saves_dir or default_saves_dir()
 
     def ensure_saves_dir(self) -> str:
         """Ensure the base saves dir exists, falling back to XDG data dir on permission errors.
 
         Returns the actual saves_dir that should be used.
         """
-        try:
-            os.makedirs(self.saves_dir, exist_ok=True)
-            return self.saves_dir
-        except PermissionError:
-            user_saves = os.path.expanduser("~/.local/share/config-saver/saves")
-            os.makedirs(user_saves, exist_ok=True)
-            self.saves_dir = user_saves
+        if os.path.isdir(self.saves_dir):
+            # Common case: nothing to create
             return self.saves_dir
+        parent = os.path.dirname(self.saves_dir) or os.sep
+        # Skip the doomed makedirs (and its exception) when the parent is plainly
+        # read-only; a missing parent is left for makedirs to decide.
+        if not os.path.isdir(parent) or os.access(parent, os.W_OK):
+            try:
+                os.makedirs(self.saves_dir, exist_ok=True)
+                return self.saves_dir
+            except PermissionError:
+                pass
+        user_saves = user_saves_dir()
+        _mkdir(user_saves)
+        self.saves_dir = user_saves
+        return self.saves_dir
+
+    def existing_saves_dir(self) -> str:
+        """Return the saves dir to read from, without creating anything.
+
+        Mirrors ensure_saves_dir's fallback: when the default dir is missing but
+        the user fallback exists, that one is used. Read-only commands call this.
+        """
+        if not os.path.isdir(self.saves_dir):
+            user_saves = user_saves_dir()
+            if os.path.isdir(user_saves):
+                self.saves_dir = user_saves
+        return self.saves_dir
 
     def list_archives(self) -> List[str]:
         """Return list of available archives, preferring the per-config 'configs' tree."""
         configs_root = os.path.join(self.saves_dir, "configs")
         files: List[str] = []
         if os.path.isdir(configs_root):
-            files = sorted(glob.glob(os.path.join(configs_root, "**", "*.tar.gz"), recursive=True))
+            files = sorted(self._iter_archives(configs_root))
 
         if not files:
-            files = sorted(glob.glob(os.path.join(self.saves_dir, "*.tar.gz")))
+            try:
+                with os.scandir(self.saves_dir) as it:
+                    files = sorted(
+                        e.path for e in it
+                        if e.name.endswith(ARCHIVE_SUFFIXES) and not e.name.startswith(".") and e.is_file()
+                    )
+            except OSError:
+                files = []
 
         return files
 
-    def compress_yaml_file(self, yaml_path: str, out_path: str, show_progress: bool = False) -> str:
+    def _iter_archives(self, configs_root: str) -> Iterator[str]:
+        """Yield every archive in the <configs_root>/<cfg>/<timestamp>/ layout.
+
+        Walks exactly those two directory levels with os.scandir, so directory
+        and file checks come from the cached d_type instead of an extra stat
+        per entry. Directories that cannot be read (or vanish meanwhile) are skipped.
+        """
+        try:
+            cfgs = list(os.scandir(configs_root))
+        except OSError:
+            return
+        for cfg in cfgs:
+            if not cfg.is_dir(follow_symlinks=False):
+                continue
+            try:
+                ts_dirs = list(os.scandir(cfg.path))
+            except OSError:
+                continue
+            for ts in ts_dirs:
+                if not ts.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    entries = list(os.scandir(ts.path))
+                except OSError:
+                    continue
+                for f in entries:
+                    if (
+                        f.name.endswith(ARCHIVE_SUFFIXES)
+                        and not f.name.startswith(".")
+                        and f.is_file(follow_symlinks=False)
+                    ):
+                        yield f.path
+
+    def compress_yaml_file(
+        self,
+        yaml_path: str,
+        out_path: str,
+        show_progress: bool = False,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
+    ) -> str:
         """Compress a single YAML config into the provided output path and return it.
 
         This keeps the original behaviour where the caller provides an explicit
         destination archive path.
         """
-        parser = Parser(yaml_path)
-        model = parser.get_model()
-        compressor = TarCompressor(model, out_path, show_progress=show_progress)
-        compressor.compress()
+        self._make_compressor(yaml_path, out_path, show_progress, compresslevel).compress()
+        return out_path
+
+    def _make_compressor(
+        self, yaml_path: str, out_path: str, show_progress: bool, compresslevel: int
+    ) -> TarCompressor:
+        """Parse yaml_path once and return a TarCompressor for it writing to out_path.
+
+        Every compress path goes through here, so each backup parses its YAML once.
+        """
+        # Imported here: parsing pulls in pydantic and PyYAML, which listing never needs
+        from config_saver.lib.parser.parser import Parser
+
+        model = Parser(yaml_path).get_model()
+        return TarCompressor(model, out_path, show_progress=show_progress, compresslevel=compresslevel)
+
+    def _find_previous_timestamp_dir(self, base_cfg_dir: str, current_timestamp: str) -> Optional[str]:
+        """Return the newest timestamp dir older than current_timestamp that holds a backup state."""
+        if os.stat not in os.supports_dir_fd or os.scandir not in os.supports_fd:
+            return self._find_previous_timestamp_dir_by_path(base_cfg_dir, current_timestamp)
+        try:
+            dfd = os.open(base_cfg_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        # Listing and state probes are all resolved relative to the one open
+        # directory, instead of walking base_cfg_dir from the root each time.
+        try:
+            with os.scandir(dfd) as it:
+                candidates = self._timestamp_candidates(it, current_timestamp)
+            # Probe newest first; normally the latest timestamp dir has a state file
+            for name in candidates:
+                try:
+                    st = os.stat(f"{name}{os.sep}{BackupState.STATE_FILENAME}", dir_fd=dfd)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    return os.path.join(base_cfg_dir, name)
+        finally:
+            os.close(dfd)
+        return None
+
+    def _find_previous_timestamp_dir_by_path(self, base_cfg_dir: str, current_timestamp: str) -> Optional[str]:
+        """Fallback for _find_previous_timestamp_dir on platforms without dir_fd support."""
+        try:
+            with os.scandir(base_cfg_dir) as it:
+                candidates = self._timestamp_candidates(it, current_timestamp)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        for name in candidates:
+            entry_path = os.path.join(base_cfg_dir, name)
+            if os.path.isfile(os.path.join(entry_path, BackupState.STATE_FILENAME)):
+                return entry_path
+        return None
+
+    @staticmethod
+    def _timestamp_candidates(entries: Iterator[os.DirEntry[str]], current_timestamp: str) -> List[str]:
+        """Return the timestamp dir names older than current_timestamp, newest first."""
+        # d_type from the directory listing answers is_dir() without a stat
+        return sorted(
+            (
+                e.name for e in entries
+                if e.name < current_timestamp
+                and _is_timestamp_name(e.name)
+                and e.is_dir(follow_symlinks=False)
+            ),
+            reverse=True,
+        )
+
+    def _compress_yaml_with_state(
+        self,
+        yaml_path: str,
+        out_path: str,
+        prev_state_dir: Optional[str] = None,
+        show_progress: bool = False,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
+    ) -> str:
+        """Compress a YAML config into out_path and record a BackupState next to it.
+
+        If the state in prev_state_dir was produced by the same config, codec and
+        compression level and none of the selected files were added, changed or removed
+        since, the previous archive is hard-linked into place instead of being rebuilt.
+        Falls back to a full compression when the link cannot be created (e.g. across
+        filesystems).
+        """
+        compressor = self._make_compressor(yaml_path, out_path, show_progress, compresslevel)
+        file_list = compressor.collect_files()
+
+        state = BackupState(os.path.dirname(out_path))
+        state.set_config(yaml_path)
+        state.codec, state.level = compressor.codec_level()
+        prev = BackupState.load(prev_state_dir) if prev_state_dir else None
+
+        # Stat every file once: the same result is compared against the previous
+        # state, recorded in the new one and handed to the compressor, so all agree.
+        stats: Dict[str, os.stat_result] = {}
+        changed = prev is None
+        if prev is None:
+            for file_path in file_list:
+                try:
+                    stats[file_path] = os.stat(file_path)
+                except OSError:
+                    continue
+                state.update_file(file_path, stats[file_path])
+        else:
+            for file_path, (status, st) in zip(file_list, prev.classify_many(file_list)):
+                if status != "unchanged":
+                    changed = True
+                if st is not None:
+                    stats[file_path] = st
+                    state.update_file(file_path, st)
+
+        reused = False
+        if (
+            prev is not None
+            and not changed
+            and prev.archive
+            # Also compares codec and level: an archive in the other codec cannot stand in for this one
+            and prev.same_config(state)
+            and not prev.has_deleted_files(file_list)
+        ):
+            try:
+                os.link(os.path.join(prev.state_dir, prev.archive), out_path)
+                reused = True
+            except OSError:
+                reused = False
+
+        if not reused:
+            compressor.compress(file_list, stats)
+
+        state.archive = os.path.basename(out_path)
+        state.save()
         return out_path
 
     def _compress_yaml_to_directory(
@@ -69,27 +302,35 @@ class BackupManager:
         archive_name: str,
         description: Optional[str] = None,
         show_progress: bool = False,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
+        prev_state_dir: Optional[str] = None,
     ) -> str:
         """Compress a YAML config into a destination directory and optionally write a description.txt.
 
-        Ensures dest_dir exists, writes description.txt if description is provided,
-        creates the tar.gz named archive_name inside dest_dir and returns its path.
+        dest_dir must already exist. Writes description.txt if description is provided,
+        creates the archive named archive_name inside dest_dir and returns its path.
+        prev_state_dir is the previous timestamp dir whose archive may be reused.
         """
-        os.makedirs(dest_dir, exist_ok=True)
-
         out_path = os.path.join(dest_dir, archive_name)
         # compress into the out_path
-        self.compress_yaml_file(yaml_path, out_path, show_progress=show_progress)
+        self._compress_yaml_with_state(
+            yaml_path, out_path, prev_state_dir=prev_state_dir, show_progress=show_progress, compresslevel=compresslevel
+        )
 
         if description:
             desc_path = os.path.join(dest_dir, "description.txt")
             try:
-                # write the description as UTF-8 text
-                with open(desc_path, "w", encoding="utf-8") as fh:
-                    fh.write(description)
+                # write the description as UTF-8 text with a single raw write;
+                # the payload is tiny, so a buffered text wrapper is pure overhead
+                fd = os.open(desc_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, description.encode("utf-8"))
+                finally:
+                    os.close(fd)
             except PermissionError:
                 # If we cannot write the description, continue silently
                 pass
+            _read_description.cache_clear()
 
         return out_path
 
@@ -100,6 +341,7 @@ class BackupManager:
         timestamp: str,
         description: Optional[str] = None,
         show_progress: bool = False,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
     ) -> str:
         """Public helper to compress a YAML into a per-timestamp directory.
 
@@ -108,10 +350,18 @@ class BackupManager:
         description.txt there. Returns the path to the created archive.
         """
         ts_dir = os.path.join(base_cfg_dir, timestamp)
-        os.makedirs(ts_dir, exist_ok=True)
+        _mkdir(ts_dir)
         cfg_basename = os.path.splitext(os.path.basename(yaml_path))[0]
-        archive_name = f"{cfg_basename}-{timestamp}.tar.gz"
-        return self._compress_yaml_to_directory(yaml_path, ts_dir, archive_name, description=description, show_progress=show_progress)
+        archive_name = f"{cfg_basename}-{timestamp}{ARCHIVE_EXT}"
+        return self._compress_yaml_to_directory(
+            yaml_path,
+            ts_dir,
+            archive_name,
+            description=description,
+            show_progress=show_progress,
+            compresslevel=compresslevel,
+            prev_state_dir=self._find_previous_timestamp_dir(base_cfg_dir, timestamp),
+        )
 
     def get_description_for_archive(self, archive_path: str) -> Optional[str]:
         """Return the description text associated with a given archive, if present.
@@ -123,15 +373,7 @@ class BackupManager:
             return None
 
         # The archive should be inside a timestamp dir: .../<cfgname>/<timestamp>/<archive>
-        archive_dir = os.path.dirname(os.path.abspath(archive_path))
-        desc_path = os.path.join(archive_dir, "description.txt")
-        if os.path.exists(desc_path) and os.path.isfile(desc_path):
-            try:
-                with open(desc_path, "r", encoding="utf-8") as fh:
-                    return fh.read().strip()
-            except (IOError, PermissionError):
-                return None
-        return None
+        return _read_description(os.path.dirname(os.path.abspath(archive_path)))
 
     def compress_directory_of_yamls(
         self,
@@ -139,59 +381,76 @@ class BackupManager:
         timestamp: str,
         show_progress: bool = False,
         description: Optional[str] = None,
+        compresslevel: int = DEFAULT_COMPRESSLEVEL,
     ) -> List[str]:
         """Compress each top-level YAML file inside input_dir into its own archive.
 
-        Produces archives under: <saves_dir>/configs/<cfgname>/<timestamp>/<cfgname>-<timestamp>.tar.gz
+        Produces archives under: <saves_dir>/configs/<cfgname>/<timestamp>/<cfgname>-<timestamp><ARCHIVE_EXT>
         If `description` is provided it will be saved alongside the archive as
         description.txt inside the timestamp directory.
+        Call ensure_saves_dir() first; it is not repeated here.
         Returns a list of created archive paths.
         """
-        patterns = [os.path.join(input_dir, "*.yaml"), os.path.join(input_dir, "*.yml")]
-        cfg_files: List[str] = []
-        for p in patterns:
-            cfg_files.extend(sorted(glob.glob(p)))
+        # One directory pass with a suffix test instead of a glob per extension.
+        # Hidden files are skipped, as the old "*.yaml" glob did.
+        with os.scandir(input_dir) as it:
+            cfg_files: List[str] = sorted(
+                e.path for e in it
+                if e.name.endswith((".yaml", ".yml")) and not e.name.startswith(".") and e.is_file()
+            )
 
         if not cfg_files:
             raise FileNotFoundError(f"No YAML configuration files found in {input_dir}.")
 
-        # Ensure base saves dir exists or fallback
-        self.ensure_saves_dir()
-
         results: List[str] = []
         skipped_root_only: List[str] = []  # Track configs skipped due to root requirement
-        for cfg in cfg_files:
-            cfg_basename = os.path.splitext(os.path.basename(cfg))[0]
-            cfg_dir = os.path.join(self.saves_dir, "configs", cfg_basename)
-            try:
-                os.makedirs(cfg_dir, exist_ok=True)
-            except PermissionError:
-                # Skip this config if we cannot create its destination
-                continue
-
-            # create a per-timestamp directory
-            ts_dir = os.path.join(cfg_dir, timestamp)
-            try:
-                os.makedirs(ts_dir, exist_ok=True)
-            except PermissionError:
-                # Skip this config if we cannot create its timestamped directory
-                continue
-
-            archive_name = f"{cfg_basename}-{timestamp}.tar.gz"
-            try:
-                out_path = self._compress_yaml_to_directory(
-                    cfg, ts_dir, archive_name, description=description, show_progress=show_progress
+        configs_root = os.path.join(self.saves_dir, "configs")
+        # Create the shared parent once, so workers only ever mkdir their own leaves
+        try:
+            _mkdir(configs_root)
+        except PermissionError:
+            pass  # each config is then skipped when its directory cannot be created
+        # The timestamp is fixed for the whole batch, so build its path pieces once.
+        ts_path_suffix = f"{os.sep}{timestamp}"
+        ts_suffix = f"-{timestamp}{ARCHIVE_EXT}"
+
+        def job(cfg: str, progress: bool) -> "functools.partial[Optional[str]]":
+            # partial of a module-level function, so it pickles into worker processes
+            return functools.partial(
+                _compress_one, cfg, self.saves_dir, configs_root, timestamp,
+                ts_path_suffix, ts_suffix, description, progress, compresslevel,
+            )
+
+        with contextlib.ExitStack() as stack:
+            if len(cfg_files) == 1:
+                # A single config gains nothing from a worker process: run it here,
+                # where it can show its own per-file progress bar.
+                futures = [_run_inline(job(cfg_files[0], show_progress))]
+            else:
+                # Every config produces an independent archive, so compress them in parallel.
+                # Workers never draw their own progress bars; the parent shows one bar per config.
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=min(len(cfg_files), os.cpu_count() or 1))
                 )
-                results.append(out_path)
-            except PermissionError as e:
-                # This YAML requires root privileges - skip it and continue
-                if "only_root_user" in str(e):
-                    skipped_root_only.append(cfg)
-                    if show_progress:
-                        print(Fore.YELLOW + f"\n⊘ Skipping {cfg_basename}: requires root privileges (only_root_user: true)")
-                else:
+                futures = [executor.submit(job(cfg, False)) for cfg in cfg_files]
+            pending: Iterable[Tuple[str, "Future[Optional[str]]"]] = zip(cfg_files, futures)
+            if show_progress and len(futures) > 1:
+                pending = tqdm(pending, total=len(futures), desc="Compressing configs", unit="config")
+            for cfg, future in pending:
+                try:
+                    out_path = future.result()
+                except PermissionError as e:
+                    # This YAML requires root privileges - skip it and continue
+                    if "only_root_user" in str(e):
+                        skipped_root_only.append(cfg)
+                        if show_progress:
+                            cfg_basename = _config_basename(cfg)
+                            tqdm.write(Fore.YELLOW + f"⊘ Skipping {cfg_basename}: requires root privileges (only_root_user: true)")
+                        continue
                     # Re-raise other permission errors
                     raise
+                if out_path is not None:
+                    results.append(out_path)
 
         # Show summary if some configs were skipped
         if skipped_root_only:
@@ -201,3 +460,78 @@ class BackupManager:
             print(Fore.YELLOW + "  To process these configs, run with: sudo config-saver --compress")
 
         return results
+
+
+_T = TypeVar("_T")
+
+
+def _run_inline(fn: Callable[[], _T]) -> "Future[_T]":
+    """Call fn in this process and return its outcome as an already-completed Future."""
+    future: "Future[_T]" = Future()
+    try:
+        future.set_result(fn())
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _config_basename(cfg: str) -> str:
+    """Return the file name of `cfg` without its extension."""
+    if os.altsep is None:
+        # POSIX: plain string ops are enough and skip the splitext machinery.
+        # Callers only pass *.yaml/*.yml names, so there is always a dot.
+        return cfg.rpartition(os.sep)[2].rpartition(".")[0]
+    return os.path.splitext(os.path.basename(cfg))[0]
+
+
+def _mkdir(path: str) -> None:
+    """Create `path`, creating missing parents only if the single mkdir fails."""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+def _compress_one(
+    cfg: str,
+    saves_dir: str,
+    configs_root: str,
+    timestamp: str,
+    ts_path_suffix: str,
+    ts_suffix: str,
+    description: Optional[str],
+    show_progress: bool,
+    compresslevel: int,
+) -> Optional[str]:
+    """Compress a single YAML config into its per-timestamp directory.
+
+    Module-level so it can be pickled into a worker process. Returns the archive
+    path, or None when the destination directories cannot be created.
+    `ts_path_suffix` and `ts_suffix` are the batch-wide "/<timestamp>" and
+    "-<timestamp><ARCHIVE_EXT>" pieces, precomputed by the caller.
+    """
+    cfg_basename = _config_basename(cfg)
+    cfg_dir = f"{configs_root}{os.sep}{cfg_basename}"
+
+    # create the per-timestamp directory; its config directory is created
+    # along with it the first time this config is saved
+    ts_dir = cfg_dir + ts_path_suffix
+    try:
+        _mkdir(ts_dir)
+    except PermissionError:
+        # Skip this config if we cannot create its timestamped directory
+        return None
+
+    archive_name = cfg_basename + ts_suffix
+    manager = BackupManager(saves_dir)
+    return manager._compress_yaml_to_directory(
+        cfg,
+        ts_dir,
+        archive_name,
+        description=description,
+        show_progress=show_progress,
+        compresslevel=compresslevel,
+        prev_state_dir=manager._find_previous_timestamp_dir(cfg_dir, timestamp),
+    )
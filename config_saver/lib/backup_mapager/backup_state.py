@@ -0,0 +1,183 @@
+"""Module providing the state recorded next to each timestamped archive"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Read size for hashing on Pythons without hashlib.file_digest
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Below this many files a thread pool costs more than the stats it would overlap
+PARALLEL_STAT_THRESHOLD = 16
+
+
+class BackupState:
+    """Inputs that produced an archive, stored as .backup-state.json in its timestamp dir.
+
+    The state records the SHA-256 of the YAML config, the codec and level the archive was
+    compressed with and the size, times and inode of every file that went into it. When a
+    later run finds the same config digest, codec and level and no new, changed or deleted
+    files, the previous archive can be reused as-is.
+    """
+
+    STATE_FILENAME = ".backup-state.json"
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.state_path = os.path.join(state_dir, self.STATE_FILENAME)
+        self.config_digest: Optional[str] = None
+        self.archive: Optional[str] = None
+        self.user_home: Optional[str] = None
+        self.codec: Optional[str] = None
+        self.level: Optional[int] = None
+        self.files: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def load(cls, state_dir: str) -> Optional["BackupState"]:
+        """Load the state stored in state_dir, or None if it is missing or unreadable."""
+        state = cls(state_dir)
+        try:
+            with open(state.state_path, "rb") as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        state.config_digest = data.get("config_digest")
+        state.archive = data.get("archive")
+        state.user_home = data.get("user_home")
+        state.codec = data.get("codec")
+        state.level = data.get("level")
+        state.files = data.get("files", {})
+        return state
+
+    def save(self) -> None:
+        """Write the state to <state_dir>/.backup-state.json.
+
+        The state is written to a temporary file and moved into place, so an
+        interrupted run never leaves a truncated state behind for the next one.
+        """
+        data = {
+            "config_digest": self.config_digest,
+            "archive": self.archive,
+            "user_home": self.user_home,
+            "codec": self.codec,
+            "level": self.level,
+            "files": self.files,
+        }
+        # Compact output: indent= forces json's pure-Python encoder and about
+        # doubles the file size; without it the C encoder handles the whole dict.
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.state_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _calculate_hash(file_path: str) -> str:
+        """Return the SHA-256 hex digest of a file's contents."""
+        with open(file_path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: readinto loop over a reused buffer, no per-chunk allocation
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            sha256 = hashlib.sha256()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+            return sha256.hexdigest()
+
+    def set_config(self, yaml_path: str) -> None:
+        """Record the digest of the YAML config and the home directory used for normalization."""
+        self.config_digest = self._calculate_hash(yaml_path)
+        self.user_home = os.path.expanduser("~")
+
+    def same_config(self, other: "BackupState") -> bool:
+        """Return True if other came from the same config, user, codec and level.
+
+        The codec and its effective level are compared rather than the requested
+        level, so a level that maps to the same zstd level still reuses the archive.
+        States written before the codec was recorded compare as different once.
+        """
+        return (
+            self.config_digest == other.config_digest
+            and self.user_home == other.user_home
+            and self.codec == other.codec
+            and self.level == other.level
+        )
+
+    @staticmethod
+    def _stat_fields(st: os.stat_result) -> Dict[str, int]:
+        """Return the metadata that identifies an unchanged file.
+
+        Like rsync/restic, a file whose size, mtime, ctime, inode and device all match
+        is treated as unchanged without reading it. ctime catches rewrites that
+        restore the old mtime; inode/dev catch files replaced by another one.
+        States written before these fields existed compare as changed once.
+        """
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "ctime_ns": st.st_ctime_ns,
+            "ino": st.st_ino,
+            "dev": st.st_dev,
+        }
+
+    def update_file(self, file_path: str, st: Optional[os.stat_result] = None) -> None:
+        """Record the current metadata of file_path (see _stat_fields).
+
+        Pass st when the file was already stat'ed (e.g. by classify) to skip the syscall.
+        """
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return
+        self.files[file_path] = self._stat_fields(st)
+
+    def classify(self, file_path: str) -> Tuple[str, Optional[os.stat_result]]:
+        """Stat file_path once and compare it with the recorded metadata.
+
+        Returns ("new" | "changed" | "unchanged", stat result), where the stat result
+        is None if the file cannot be stat'ed. The stat result can be handed to
+        update_file on another state so each file is stat'ed once per backup.
+        """
+        try:
+            st: Optional[os.stat_result] = os.stat(file_path)
+        except OSError:
+            st = None
+        recorded = self.files.get(file_path)
+        if recorded is None:
+            return "new", st
+        if st is None or recorded != self._stat_fields(st):
+            return "changed", st
+        return "unchanged", st
+
+    def classify_many(
+        self, file_list: Sequence[str], max_workers: Optional[int] = None
+    ) -> List[Tuple[str, Optional[os.stat_result]]]:
+        """Return classify() for every file in file_list, in order.
+
+        os.stat releases the GIL, so on cold caches or network filesystems a thread
+        pool overlaps the metadata lookups. Small lists are classified serially.
+        """
+        if len(file_list) < PARALLEL_STAT_THRESHOLD:
+            return [self.classify(file_path) for file_path in file_list]
+        workers = max_workers or min(32, (os.cpu_count() or 4) * 2)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.classify, file_list))
+
+    def has_deleted_files(self, file_list: Iterable[str]) -> bool:
+        """Return True if any recorded file is no longer part of file_list.
+
+        Stops at the first missing file; the reuse check only needs yes or no.
+        """
+        current = set(file_list)
+        return any(file_path not in current for file_path in self.files)
@@ -3,25 +3,40 @@ from __future__ import annotations
 
 import argparse
 import os
-import re
 import sys
 import shutil
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from colorama import Fore, init
-from pydantic import ValidationError
-from rich.align import Align
-from rich.columns import Columns
-from rich.console import Console
-from rich.table import Table
+from config_saver.lib.backup_mapager.backup_manager import BackupManager, user_saves_dir
+from config_saver.lib.tar_compressor.tar_compressor import ARCHIVE_EXT, ARCHIVE_SUFFIXES, DEFAULT_COMPRESSLEVEL
 
-from config_saver import __version__
-from config_saver.lib.backup_mapager.backup_manager import BackupManager
-from config_saver.lib.tar_compressor.tar_decompressor import TarDecompressor
+# Only colour real terminals; piped output gets plain text and skips colorama's stream wrapper
+_COLOR = sys.stdout.isatty()
+if _COLOR:
+    init(autoreset=True)
+_RED, _GREEN, _YELLOW = (Fore.RED, Fore.GREEN, Fore.YELLOW) if _COLOR else ("", "", "")
 
-init(autoreset=True)
+
+def _split_archive_name(name: str) -> Optional[tuple[str, str]]:
+    """Split '<name>-YYYYMMDD-HHMMSS.tar.gz' (or .tar.zst) into (name, timestamp).
+
+    The timestamp has a fixed shape, so it is split off by slicing at known
+    offsets. Returns None for other names.
+    """
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            stem = name[:-len(suffix)]
+            break
+    else:
+        return None
+    ts = stem[-15:]
+    if (len(stem) > 16 and stem[-16] == "-" and ts[8] == "-" and ts.isascii()
+            and ts[:8].isdigit() and ts[9:].isdigit()):
+        return stem[:-16], ts
+    return None
 
 
 class BackupTable:
@@ -31,51 +46,82 @@ class BackupTable:
     will fall back to top-level archives. It delegates listing to BackupManager.
     """
 
-    # Matches <name>-YYYYMMDD-HHMMSS.tar.gz
-    FILENAME_PATTERN = re.compile(r"(.+)-(\d{8}-\d{6})\.tar\.gz$")
-
     def __init__(self, saves_dir: str):
         self.saves_dir = saves_dir
-        self.user_saves = os.path.expanduser("~/.local/share/config-saver/saves")
+        self.user_saves = user_saves_dir()
+        self._manager = BackupManager(saves_dir)
 
     def _gather_files(self) -> list[str]:
-        manager = BackupManager(self.saves_dir)
-        return manager.list_archives()
-
-    def _parse_ts(self, path: str) -> datetime:
-        name = os.path.basename(path)
-        m = self.FILENAME_PATTERN.search(name)
-        if m:
-            try:
-                return datetime.strptime(m.group(1), "%Y%m%d-%H%M%S")
-            except ValueError:
-                pass
-        return datetime.fromtimestamp(os.path.getmtime(path))
+        return self._manager.list_archives()
+
+    def _parse_ts(self, path: str, ts_str: Optional[str]) -> str:
+        """Return the YYYYMMDD-HHMMSS stamp from the archive name, falling back to its mtime.
+
+        The stamp stays a string: it sorts chronologically as is, and the listing
+        only needs it reformatted for display, so no datetime is built for it.
+        """
+        if ts_str is not None:
+            return ts_str
+        return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y%m%d-%H%M%S")
 
     def render(self) -> None:
         files = self._gather_files()
         if not files:
-            print(f"No config-saver tar.gz files found in {self.saves_dir} or {self.user_saves}.")
+            print(f"No config-saver archives found in {self.saves_dir} or {self.user_saves}.")
             return
 
-        # Group timestamps by config basename
-        grouped: dict[str, list[datetime]] = {}
+        entries: list[tuple[str, str, str]] = []
         for f in files:
             name = os.path.basename(f)
-            m = self.FILENAME_PATTERN.match(name)
-            if m:
-                cfgname = m.group(1)
+            parts = _split_archive_name(name)
+            if parts:
+                cfgname, ts_str = parts
             else:
-                cfgname = os.path.splitext(name)[0]
-            grouped.setdefault(cfgname, []).append(self._parse_ts(f))
+                cfgname, ts_str = os.path.splitext(name)[0], None
+            entries.append((cfgname, self._parse_ts(f, ts_str), f))
+        # One sort for the whole listing: configs by name, each newest first
+        # (two stable passes), so every bucket below is filled already in order.
+        entries.sort(key=lambda e: e[1], reverse=True)
+        entries.sort(key=lambda e: e[0])
+
+        # Group (timestamp, archive path) pairs by config basename; keeping the path
+        # from the single listing above means no per-config rescan to find descriptions
+        grouped: dict[str, list[tuple[str, str]]] = {}
+        for cfgname, ts, path in entries:
+            grouped.setdefault(cfgname, []).append((ts, path))
+
+        # Rows per config: (No., date, description preview)
+        rows: dict[str, list[tuple[str, str, str]]] = {}
+
+        for cfgname, archives in grouped.items():
+            cfg_rows = rows.setdefault(cfgname, [])
+            for i, (t, path) in enumerate(archives, start=1):
+                desc = self._manager.get_description_for_archive(path) or ""
+
+                # Truncate description for display ("" for most archives, which have none)
+                preview = desc if len(desc) <= 60 else desc[:57] + "..."
+
+                date = f"{t[0:4]}-{t[4:6]}-{t[6:8]} {t[9:11]}:{t[11:13]}:{t[13:15]}"
+                cfg_rows.append((str(i), date, preview))
+
+        if _COLOR:
+            self._print_tables(rows)
+        else:
+            self._print_plain(rows)
+
+    def _print_tables(self, rows: dict[str, list[tuple[str, str, str]]]) -> None:
+        """Print one rich table per config, arranged left-to-right."""
+        # rich pulls in dozens of modules; only the interactive listing needs it
+        from rich.align import Align
+        from rich.columns import Columns
+        from rich.console import Console
+        from rich.table import Table
 
         console = Console()
 
         # Build a table per config and arrange them left-to-right using Columns
         tables: list[Table] = []
-        manager = BackupManager(self.saves_dir)
-
-        for cfgname, timestamps in grouped.items():
+        for cfgname, cfg_rows in rows.items():
             table = Table(
                 show_header=True,
                 header_style="bold bright_blue",
@@ -89,43 +135,59 @@ class BackupTable:
             table.add_column("Date", overflow="fold", justify="center", no_wrap=True)
             # Description column: header centered, content left-justified
             table.add_column(Align.center("Description"), overflow="fold", justify="left")
+            for row in cfg_rows:
+                table.add_row(*row)
+            tables.append(table)
 
-            # sort timestamps descending (newest first)
-            timestamps.sort(reverse=True)
-
-            # We need to map timestamp back to a specific archive path to fetch its description.
-            # The manager.list_archives already returned full paths; we'll rebuild a small lookup
-            # by scanning the saves tree for archives that match this cfgname.
-            all_archives = manager.list_archives()
-            # Filter archives that belong to this cfgname
-            cfg_archives = [p for p in all_archives if os.path.basename(p).startswith(cfgname + "-")]
-            # Build a mapping from timestamp string (YYYYMMDD-HHMMSS) to archive path
-            archive_map: dict[str, str] = {}
-            for p in cfg_archives:
-                m = self.FILENAME_PATTERN.search(os.path.basename(p))
-                if m:
-                    archive_map[m.group(2)] = p
-
-            for i, t in enumerate(timestamps, start=1):
-                ts_str = t.strftime("%Y%m%d-%H%M%S")
-                desc = None
-                if ts_str in archive_map:
-                    desc = manager.get_description_for_archive(archive_map[ts_str])
-
-                # Truncate description for display
-                if desc:
-                    preview = desc if len(desc) <= 60 else desc[:57] + "..."
-                else:
-                    preview = ""
+        # Print header then the columns (left-to-right). Use 2 spaces padding between tables and do not expand to terminal width.
+        # Inside "with console" rich buffers everything and writes it out once on exit.
+        with console:
+            console.rule("Saved configurations")
+            console.print(Columns(tables, expand=False, padding=(0, 2), equal=False))
+            console.rule()
+
+    def _print_plain(self, rows: dict[str, list[tuple[str, str, str]]]) -> None:
+        """Print the listing as plain text, for pipes and files where rich layout is wasted."""
+        lines: list[str] = []
+        for cfgname, cfg_rows in rows.items():
+            lines.append(f"{cfgname}:")
+            lines.extend(f"  {no:>3}  {date}  {preview}".rstrip() for no, date, preview in cfg_rows)
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _is_validation_error(e: BaseException) -> bool:
+    """Return True for a pydantic ValidationError.
+
+    pydantic is imported here rather than at module level, so it is only loaded
+    once an error is being handled. It cannot be skipped when it was not yet
+    imported in this process: directory mode validates in worker processes and
+    re-raises their errors in the parent.
+    """
+    from pydantic import ValidationError
+    return isinstance(e, ValidationError)
+
+
+def _package_version() -> str:
+    """Return the installed package version (looked up only when it is shown)."""
+    from config_saver import __version__
+    return __version__
 
-                table.add_row(str(i), t.strftime("%Y-%m-%d %H:%M:%S"), preview)
-            tables.append(table)
 
-    # Print header then the columns (left-to-right). Use 2 spaces padding between tables and do not expand to terminal width.
-        console.rule("Saved configurations")
-        console.print(Columns(tables, expand=False, padding=(0, 2), equal=False))
-        console.rule()
+class _VersionAction(argparse.Action):
+    """Like argparse's 'version' action, but resolves the version only when invoked."""
 
+    def __init__(self, option_strings: list[str], dest: str = argparse.SUPPRESS, help: Optional[str] = None):
+        super().__init__(option_strings=option_strings, dest=dest, default=argparse.SUPPRESS, nargs=0, help=help)
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        print(f"{parser.prog} {_package_version()}")
+        parser.exit()
 
 
 class CLI:
@@ -134,48 +196,69 @@ class CLI:
     # Default to the directory containing multiple YAML configs
     DEFAULT_SYSTEM_CONFIG = "/etc/config-saver/configs"
 
+    # Built on first use and shared by every CLI instance
+    _parser: Optional[argparse.ArgumentParser] = None
+
     def __init__(self, argv: Optional[list[str]] = None):
         self.argv = argv
 
     def parse_args(self) -> argparse.Namespace:
+        argv = self.argv if self.argv is not None else sys.argv[1:]
+        if argv[:1] in (["-v"], ["--version"]):
+            # Answer before building the parser; same output as argparse's version action
+            print(f"config-saver {_package_version()}")
+            sys.exit(0)
+        return self._get_parser().parse_args(argv)
+
+    @classmethod
+    def _get_parser(cls) -> argparse.ArgumentParser:
+        """Return the argument parser, building it the first time it is needed."""
+        if cls._parser is not None:
+            return cls._parser
         parser = argparse.ArgumentParser(description="Tar compressor/decompressor utility", prog="config-saver")
         group = parser.add_mutually_exclusive_group(required=True)
         group.add_argument('--compress', '-c', action='store_true', help='Compress files/directories from YAML config')
         group.add_argument('--decompress', '-d', action='store_true', help='Decompress a tar file')
-        group.add_argument('--list', '-l', action='store_true', help='List saved config-saver tar.gz files')
+        group.add_argument('--list', '-l', action='store_true', help='List saved config-saver archives')
         group.add_argument('--export-config', '-e', type=str, metavar='NAME', help='Export the latest config archive by name')
         group.add_argument('--export-all-configs', action='store_true', help='Export the latest archive for every saved configuration')
         group.add_argument('--show-configs', action='store_true', help='Show available configuration names')
-        parser.add_argument('--input', '-i', type=str, default=self.DEFAULT_SYSTEM_CONFIG, help='Input YAML config (for compress) or tar file (for decompress)')
+        parser.add_argument('--input', '-i', type=str, default=cls.DEFAULT_SYSTEM_CONFIG, help='Input YAML config (for compress) or tar file (for decompress)')
         parser.add_argument('--output', '-o', type=str, default=None, help='Output tar file (for compress) or extraction directory (for decompress, optional)')
         parser.add_argument('--progress', '-P', action='store_true', help='Show progress bar during compression/decompression')
         parser.add_argument('--description', '-m', type=str, default=None, help='Optional description to save alongside the archive')
-        parser.add_argument('--version', '-v', action='version', version=f'%(prog)s {__version__}', help='Show program version and exit')
-        return parser.parse_args(self.argv)
+        parser.add_argument('--compress-level', type=int, choices=range(1, 10), default=DEFAULT_COMPRESSLEVEL, metavar='{1-9}', help=f'Compression level, mapped onto zstd levels for .tar.zst (default: {DEFAULT_COMPRESSLEVEL}; 9 gives smaller but slower archives)')
+        parser.add_argument('--version', '-v', action=_VersionAction, help='Show program version and exit')
+        cls._parser = parser
+        return parser
 
     def run(self) -> None:
         args = self.parse_args()
 
         manager = BackupManager()
-        saves_dir = manager.ensure_saves_dir()
-        try:
+        if args.compress:
+            # Only compression creates the saves dir and names archives after the clock
+            saves_dir = manager.ensure_saves_dir()
             timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-
+        else:
+            # Listing and exporting read what exists; decompress never looks at the saves dir
+            saves_dir = manager.saves_dir if args.decompress else manager.existing_saves_dir()
+            timestamp = ""
+        try:
             # Show available configuration names
             if args.show_configs:
                 archives = manager.list_archives()
                 config_names: set[str] = set()
                 for p in archives:
-                    name = os.path.basename(p)
-                    m = re.match(r"(.+)-(\d{8}-\d{6})\.tar\.gz$", name)
-                    if m:
-                        config_names.add(m.group(1))
+                    parts = _split_archive_name(os.path.basename(p))
+                    if parts:
+                        config_names.add(parts[0])
                 if config_names:
-                    print(Fore.GREEN + "Available configurations:")
-                    for cfg in sorted(config_names):
-                        print("- " + cfg)
+                    print(_GREEN + "Available configurations:")
+                    # one write for the whole list instead of one per name
+                    sys.stdout.write("".join(f"- {cfg}\n" for cfg in sorted(config_names)))
                 else:
-                    print(Fore.YELLOW + "No saved configurations found.")
+                    print(_YELLOW + "No saved configurations found.")
                 return
 
             # Export the latest configuration by name
@@ -183,39 +266,39 @@ class CLI:
                 cfgname = args.export_config
                 # Search for files matching the name
                 archives = manager.list_archives()
-                # Filtrar por nombre
-                matching = [p for p in archives if os.path.basename(p).startswith(cfgname + "-")]
+                # Filtrar por nombre; keep (timestamp, basename, path) so basename runs once per archive
+                prefix = cfgname + "-"
+                matching: list[tuple[str, str, str]] = []
+                for p in archives:
+                    name = os.path.basename(p)
+                    if name.startswith(prefix):
+                        parts = _split_archive_name(name)
+                        matching.append((parts[1] if parts else "00000000-000000", name, p))
                 if not matching:
-                    print(Fore.RED + f"No saved configuration found with the name: {cfgname}")
+                    print(_RED + f"No saved configuration found with the name: {cfgname}")
                     sys.exit(7)
-                # Ordenar por timestamp descendente
-                def extract_ts(path: str) -> str:
-                    m = re.search(r"-(\d{8}-\d{6})\.tar\.gz$", os.path.basename(path))
-                    return m.group(1) if m else "00000000-000000"
-                matching.sort(key=extract_ts, reverse=True)
-                latest = matching[0]
+                # Newest timestamp; max() keeps the first on ties, like the old stable sort
+                _ts, latest_name, latest = max(matching, key=lambda m: m[0])
                 # If --output is specified, copy the file there
                 if args.output:
                     dest_path = args.output
                 else:
                     home = os.path.expanduser("~")
-                    dest_path = os.path.join(home, os.path.basename(latest))
+                    dest_path = os.path.join(home, latest_name)
                 shutil.copy2(latest, dest_path)
-                print(Fore.GREEN + f"Export completed: {dest_path}")
+                print(_GREEN + f"Export completed: {dest_path}")
                 return
 
             # Export the latest version of all available configurations
             if getattr(args, 'export_all_configs', False):
                 archives = manager.list_archives()
                 cfg_latest: dict[str, tuple[str, str]] = {}
-                # pattern to extract <name>-YYYYMMDD-HHMMSS.tar.gz
-                pattern = re.compile(r"(.+)-(\d{8}-\d{6})\.tar\.gz$")
                 for p in archives:
                     name = os.path.basename(p)
-                    m = pattern.match(name)
-                    if m:
-                        cfg = m.group(1)
-                        ts = m.group(2)
+                    # <name>-YYYYMMDD-HHMMSS.tar.gz (or .tar.zst)
+                    parts = _split_archive_name(name)
+                    if parts:
+                        cfg, ts = parts
                     else:
                         cfg = os.path.splitext(name)[0]
                         ts = "00000000-000000"
@@ -224,7 +307,7 @@ class CLI:
                         cfg_latest[cfg] = (ts, p)
 
                 if not cfg_latest:
-                    print(Fore.YELLOW + "No saved configurations found.")
+                    print(_YELLOW + "No saved configurations found.")
                     return
 
                 # Determine destination directory for exports. For multi-export we treat --output as a directory.
@@ -234,43 +317,56 @@ class CLI:
                     dest_dir = os.path.expanduser("~")
 
                 try:
-                    os.makedirs(dest_dir, exist_ok=True)
+                    # The destination usually exists (the home dir by default): one mkdir
+                    # answers that, makedirs only runs when parents are missing
+                    try:
+                        os.mkdir(dest_dir)
+                    except FileExistsError:
+                        pass
+                    except FileNotFoundError:
+                        os.makedirs(dest_dir, exist_ok=True)
                 except PermissionError:
-                    print(Fore.RED + f"Cannot create output directory: {dest_dir}")
+                    print(_RED + f"Cannot create output directory: {dest_dir}")
                     sys.exit(6)
 
                 for cfg, (_ts, src_path) in sorted(cfg_latest.items()):
                     dest_path = os.path.join(dest_dir, os.path.basename(src_path))
                     try:
                         shutil.copy2(src_path, dest_path)
-                        print(Fore.GREEN + f"Exported: {dest_path}")
+                        print(_GREEN + f"Exported: {dest_path}")
                     except PermissionError:
-                        print(Fore.RED + f"Permission denied copying {src_path} -> {dest_path}")
+                        print(_RED + f"Permission denied copying {src_path} -> {dest_path}")
                 return
 
             # Directory-mode compression
             if args.compress and os.path.isdir(args.input):
                 if args.output is not None:
-                    print(Fore.RED + "When --input is a directory you may not provide --output. Please omit --output to create per-file archives.")
+                    print(_RED + "When --input is a directory you may not provide --output. Please omit --output to create per-file archives.")
                     sys.exit(6)
 
                 try:
                     created = manager.compress_directory_of_yamls(
-                        args.input, timestamp, show_progress=args.progress, description=args.description
+                        args.input,
+                        timestamp,
+                        show_progress=args.progress,
+                        description=args.description,
+                        compresslevel=args.compress_level,
                     )
                 except FileNotFoundError as e:
-                    print(Fore.RED + str(e))
+                    print(_RED + str(e))
                     sys.exit(2)
 
-                for p in created:
-                    print(Fore.GREEN + f"Compression completed successfully. Output: {p}")
+                # One write for the whole batch instead of a print per archive
+                if created:
+                    sys.stdout.write(
+                        _GREEN + "Compression completed successfully. Output:\n"
+                        + "".join(f"  {p}\n" for p in created)
+                    )
                 return
 
-            # Ensure saves dir exists for single-file behavior (manager already ensured above)
-
             # If the user didn't pass an explicit output for single-file compress, set default name using timestamp
             if args.output is None and args.compress:
-                args.output = os.path.join(saves_dir, f"config-saver-{timestamp}.tar.gz")
+                args.output = os.path.join(saves_dir, f"config-saver-{timestamp}{ARCHIVE_EXT}")
 
             if args.list:
                 # Use BackupTable to render a table of dates for saved archives
@@ -287,15 +383,24 @@ class CLI:
                     cfg_basename = os.path.splitext(os.path.basename(args.input))[0]
                     cfg_dir = os.path.join(saves_dir, "configs", cfg_basename)
                     out_path = manager.compress_yaml_to_timestamp_dir(
-                        args.input, cfg_dir, timestamp, description=args.description, show_progress=args.progress
+                        args.input,
+                        cfg_dir,
+                        timestamp,
+                        description=args.description,
+                        show_progress=args.progress,
+                        compresslevel=args.compress_level,
                     )
-                    print(Fore.GREEN + f"Compression completed successfully. Output: {out_path}")
+                    print(_GREEN + f"Compression completed successfully. Output: {out_path}")
                 else:
-                    manager.compress_yaml_file(args.input, args.output, show_progress=args.progress)
-                    print(Fore.GREEN + f"Compression completed successfully. Output: {args.output}")
+                    manager.compress_yaml_file(
+                        args.input, args.output, show_progress=args.progress, compresslevel=args.compress_level
+                    )
+                    print(_GREEN + f"Compression completed successfully. Output: {args.output}")
                 return
 
             if args.decompress:
+                from config_saver.lib.tar_compressor.tar_decompressor import TarDecompressor
+
                 decompressor = TarDecompressor(args.input, args.output, show_progress=args.progress)
                 decompressor.decompress()
                 return
@@ -303,21 +408,23 @@ class CLI:
         except FileNotFoundError as e:
             # e.filename may not be present if FileNotFoundError was raised manually
             if hasattr(e, "filename") and e.filename is not None:
-                print(Fore.RED + f"Configuration file not found: {e.filename}")
+                print(_RED + f"Configuration file not found: {e.filename}")
             else:
-                print(Fore.RED + f"Configuration file not found: {str(e)}")
+                print(_RED + f"Configuration file not found: {str(e)}")
             sys.exit(2)
-        except ValidationError as e:
+        except ValueError as e:
+            if not _is_validation_error(e):
+                raise
             # pydantic validation error
-            print(Fore.RED + "Validation error in configuration:")
-            print(Fore.RED + str(e))
+            print(_RED + "Validation error in configuration:")
+            print(_RED + str(e))
             sys.exit(3)
         except PermissionError as e:
-            print(Fore.RED + f"Permission error: {e}")
+            print(_RED + f"Permission error: {e}")
             sys.exit(4)
         except RuntimeError as e:
-            print(Fore.RED + f"Runtime error: {e}")
+            print(_RED + f"Runtime error: {e}")
             sys.exit(5)
         except (OSError, IOError) as e:
-            print(Fore.RED + f"I/O error: {e}")
+            print(_RED + f"I/O error: {e}")
             sys.exit(10)
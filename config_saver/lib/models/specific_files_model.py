@@ -1,7 +1,8 @@
 """Module providing a SpecificFilesModel"""
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class SpecificFilesModel(BaseModel):
     """Class representing a directory with only some files to export"""
+    model_config = ConfigDict(frozen=True)
     source: str
     files: list[str]
\ No newline at end of file
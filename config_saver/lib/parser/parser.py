@@ -1,75 +1,174 @@
 """Module providing a yaml and json parser with pydantic validation"""
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union
+import functools
+import hashlib
+import json
 import os
 
 import yaml
+from pydantic import ValidationError
+
+try:
+    # libyaml's C loader parses several times faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
 
 from config_saver.lib.models.model import Model
+from config_saver.lib.models.specific_files_model import SpecificFilesModel
 from config_saver.lib.utils.path_expander import PathExpander
 
 
+# (path, mtime_ns, size, sha256 hex digest of the contents)
+CacheKey = Tuple[str, int, int, str]
+
+
+class ParserCache:
+    """In-process cache of loaded YAML documents.
+
+    Entries are keyed on the file's bytes themselves, so a document always matches
+    the bytes its cache key was hashed from. Callers must not mutate the returned data.
+    """
+    def __init__(self, maxsize: int = 128):
+        self._load = functools.lru_cache(maxsize=maxsize)(self._load_uncached)
+
+    def get(self, data: bytes) -> Any:
+        """Return the YAML document in data (as returned by read()), parsing it only on a cache miss"""
+        return self._load(data)
+
+    @staticmethod
+    def read(path: str) -> Tuple[CacheKey, bytes]:
+        """Read path once and return its cache key along with the bytes the key was hashed from"""
+        with open(path, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            data = fh.read()
+        return (path, st.st_mtime_ns, st.st_size, hashlib.sha256(data).hexdigest()), data
+
+    @staticmethod
+    def _load_uncached(data: bytes) -> Any:
+        # libyaml is faster on an in-memory buffer than on a file stream
+        return yaml.load(data, Loader=_YamlLoader)
+
+
+_PARSER_CACHE = ParserCache()
+
+
+@functools.lru_cache(maxsize=None)
+def _path_expander() -> PathExpander:
+    """Return the shared PathExpander; building one resolves ~ and ~root each time."""
+    return PathExpander()
+
+
+# Directory holding the JSON copies of validated configs, so warm runs skip YAML parsing
+MODEL_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "config-saver", "models"
+)
+
+
+def _sidecar_path(path: str) -> str:
+    name = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(MODEL_CACHE_DIR, f"{name}.json")
+
+
+def _read_sidecar(key: CacheKey, version: str) -> Optional[Dict[str, Any]]:
+    """Return the cached model data for key, or None if missing or stale."""
+    try:
+        with open(_sidecar_path(key[0]), "rb") as fh:
+            cached = json.loads(fh.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("digest") != key[3] or cached.get("version") != version:
+        return None
+    return cached.get("model")
+
+
+def _write_sidecar(key: CacheKey, version: str, model: Model) -> None:
+    """Store model as JSON for key; failures only cost a YAML parse on the next run."""
+    cache_path = _sidecar_path(key[0])
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    payload = {"version": version, "digest": key[3], "model": model.model_dump(mode="json")}
+    try:
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=128)
+def _validate(key: CacheKey, data: bytes) -> Model:
+    """Validate the YAML document in data, the config contents key was hashed from.
+
+    A JSON copy of the validated model is kept under MODEL_CACHE_DIR, keyed on the
+    config's path and checked against its content digest and the package version, so
+    later runs validate from JSON instead of parsing the YAML again. Model is frozen,
+    so the cached instance can be shared between callers.
+    """
+    from config_saver import __version__
+
+    cached = _read_sidecar(key, __version__)
+    if cached is not None:
+        try:
+            return Model.model_validate(cached)
+        except ValidationError:
+            pass
+    model = Model.model_validate(_PARSER_CACHE.get(data))
+    _write_sidecar(key, __version__, model)
+    return model
+
+
 class Parser:
     """Class representing a yaml and json parser for our model"""
     def __init__(self, filename: str):
         self.filename: str = filename
-        with open(self.filename, "r", encoding="utf-8") as yaml_file:
-            yaml_data = yaml.safe_load(yaml_file)
-            validated_data = Model.model_validate(yaml_data)
-            
-            # Check if only_root_user is enabled and verify user permissions
-            # Note: root user (uid==0) can always execute any configuration
-            if validated_data.only_root_user:
-                if os.getuid() != 0:
-                    raise PermissionError(
-                        f"Configuration '{filename}' requires root privileges (only_root_user: true). "
-                        "Please run with sudo or as root user."
-                    )
-            
-            raw_dict: Dict[str, Any] = validated_data.model_dump()
-            expanded_dict: Dict[str, Any] = self._expand_dict(raw_dict)
-            validated_expanded = Model.model_validate(expanded_dict)
-            self._model: Model = validated_expanded
-            self._data: Dict[str, Any] = expanded_dict
+        validated_data = _validate(*ParserCache.read(self.filename))
+        
+        # Check if only_root_user is enabled and verify user permissions
+        # Note: root user (uid==0) can always execute any configuration
+        if validated_data.only_root_user:
+            if os.getuid() != 0:
+                raise PermissionError(
+                    f"Configuration '{filename}' requires root privileges (only_root_user: true). "
+                    "Please run with sudo or as root user."
+                )
+        
+        self._model: Model = self._expand_model(validated_data)
+        # Dict form of the model, dumped on first use; the compressors only need the model
+        self._data: Optional[Dict[str, Any]] = None
 
     def get_attr(self, attr_name: str) -> Optional[Any]:
         """Get an attribute from the parsed data"""
-        return self._data.get(attr_name, None)
+        return self.get_data().get(attr_name, None)
 
     def get_data(self) -> Dict[str, Any]:
         """Return the parsed (and already-expanded) data as a dictionary"""
+        if self._data is None:
+            self._data = self._model.model_dump()
         return self._data
 
-    def _expand_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Return a copy of data with paths expanded in 'location' and 'directories'."""
-        expander = PathExpander()
-        out: Dict[str, Any] = data.copy()
-        # Expande los campos 'location' en save/export si existen
-        for section in ["save", "export"]:
-            if section in out:
-                for item in out[section]:
-                    loc = out[section][item].get("location")
-                    if loc:
-                        out[section][item]["location"] = expander.expand(loc)
-        # Expande los valores en la lista 'directories' si existe
-        if "directories" in out:
-            new_dirs: List[Union[str, Dict[str, Any]]] = []
-            for entry in out["directories"]:
-                if isinstance(entry, str):
-                    new_dirs.append(expander.expand(entry))
-                elif isinstance(entry, dict) and "source" in entry:
-                    # Cast entry to Dict[str, Any] to help type checker
-                    entry_dict = cast(Dict[str, Any], entry)
-                    new_entry: Dict[str, Any] = entry_dict.copy()
-                    new_entry["source"] = expander.expand(str(entry_dict["source"]))
-                    new_dirs.append(new_entry)
-                else:
-                    # Cast unknown entry to appropriate type
-                    if isinstance(entry, dict):
-                        new_dirs.append(cast(Dict[str, Any], entry))
-                    else:
-                        new_dirs.append(str(entry))
-            out["directories"] = new_dirs
-        return out
+    def _expand_model(self, model: Model) -> Model:
+        """Return a copy of model with the paths in 'directories' expanded.
+
+        Expansion only substitutes strings into fields that are already validated as
+        str, so the copy is built with model_copy instead of a dump + re-validation.
+        """
+        expander = _path_expander()
+        # Configs often repeat a path; expand each distinct one only once per parse
+        expanded: Dict[str, str] = {}
+
+        def expand(path: str) -> str:
+            if path not in expanded:
+                expanded[path] = expander.expand(path)
+            return expanded[path]
+
+        new_dirs: List[Union[str, SpecificFilesModel]] = []
+        for entry in model.directories:
+            if isinstance(entry, str):
+                new_dirs.append(expand(entry))
+            else:
+                new_dirs.append(entry.model_copy(update={"source": expand(entry.source)}))
+        return model.model_copy(update={"directories": new_dirs})
 
     def get_model(self) -> Model:
         """Return the validated pydantic Model instance."""
@@ -1,16 +1,41 @@
 """Module providing a tar decompressor that extracts files to their original directories"""
+import contextlib
+import gzip
 import os
+import shutil
 import tarfile
-from typing import Optional
+from typing import IO, Iterator, Optional, Tuple, Type, cast
 
 from colorama import Fore, init
 from tqdm import tqdm
 
+from config_saver.lib.utils.text import TEXT_SNIFF_SIZE, looks_like_text
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install 'config_saver[zstd]'
+    zstandard = None  # type: ignore[assignment]
+
 init(autoreset=True)
 
 # Placeholder for user home directory in file contents (must match compressor)
 HOME_CONTENT_PLACEHOLDER = "<<<HOME_PLACEHOLDER>>>"
 
+# Errors that mean the archive itself is unreadable
+ARCHIVE_ERRORS: Tuple[Type[BaseException], ...] = (tarfile.TarError, OSError, EOFError)
+if zstandard is not None:
+    ARCHIVE_ERRORS += (zstandard.ZstdError,)
+
+# Frame magic at the start of every zstd stream
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Read buffer for the compressed archive; only the raw file is buffered, the gzip
+# stream on top of it reads from this buffer directly
+INPUT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Chunk size the zstd decompressor pulls from the raw file
+ZSTD_READ_SIZE = 1024 * 1024
+
 
 
 class TarDecompressor:
@@ -38,15 +63,8 @@ class TarDecompressor:
 
     def _is_text_file_content(self, content: bytes) -> bool:
         """Check if content is likely text (not binary)"""
-        # Check for null bytes
-        if b'\0' in content[:8192]:
-            return False
-        # Try to decode as UTF-8
-        try:
-            content[:8192].decode('utf-8')
-            return True
-        except UnicodeDecodeError:
-            return False
+        # Same check the compressor used when deciding what to normalize
+        return looks_like_text(content[:TEXT_SNIFF_SIZE])
 
     def _denormalize_file_content(self, content: bytes) -> bytes:
         """Replace HOME_CONTENT_PLACEHOLDER with actual user home in file content"""
@@ -71,88 +89,156 @@ class TarDecompressor:
         
         return content
 
+    def _restore_hardlink(self, target_path: str, link_path: str) -> None:
+        """Recreate a hard-link member by linking link_path to the already restored target_path.
+
+        tarfile's own fallback re-reads the target member from the archive, which needs a
+        backward seek that the single-pass stream cannot do. So the link is made here,
+        replacing any existing file, and copied when linking is impossible (e.g. across
+        filesystems). A link whose target is missing is skipped with a warning.
+        """
+        if not os.path.exists(target_path):
+            # The target was not restored; skip this member instead of failing the rest
+            tqdm.write(Fore.YELLOW + f"[WARNING] Skipping hard link '{link_path}': '{target_path}' is missing")
+            return
+        os.makedirs(os.path.dirname(link_path) or os.sep, exist_ok=True)
+        if os.path.lexists(link_path):
+            # exists() is False for a dangling symlink, which samefile cannot stat
+            if os.path.exists(link_path) and os.path.samefile(target_path, link_path):
+                return
+            os.unlink(link_path)
+        try:
+            os.link(target_path, link_path)
+        except OSError:
+            shutil.copy2(target_path, link_path)
+
+    @contextlib.contextmanager
+    def _open_archive(self) -> Iterator[Tuple[tarfile.TarFile, IO[bytes]]]:
+        """Open the archive as a single-pass tar stream, picking the codec from its magic bytes.
+
+        Sniffing the content rather than the suffix keeps exported copies readable
+        whatever name they were given.
+
+        Yields the tar stream and the raw file object, whose position drives the
+        progress bar. Streaming mode never seeks back into the compressed stream.
+        """
+        with open(self.tar_path, "rb", buffering=INPUT_BUFFER_SIZE) as raw:
+            magic = raw.read(len(ZSTD_MAGIC))
+            raw.seek(0)
+            if magic == ZSTD_MAGIC:
+                if zstandard is None:
+                    raise RuntimeError(
+                        f"Reading '{self.tar_path}' requires the 'zstandard' package "
+                        "(pip install 'config_saver[zstd]')"
+                    )
+                stream = cast(IO[bytes], zstandard.ZstdDecompressor().stream_reader(
+                    raw, read_size=ZSTD_READ_SIZE, closefd=False
+                ))
+            else:
+                stream = cast(IO[bytes], gzip.GzipFile(fileobj=raw, mode="rb"))
+            with stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+                yield tar, raw
+
     def decompress(self):
         """Extract all files and folders from the tar archive to their original structure or absolute paths, with optional progress bar"""
         if not os.path.exists(self.tar_path):
             print(Fore.RED + f"[ERROR] Tar file '{self.tar_path}' does not exist.")
             return
         try:
-            with tarfile.open(self.tar_path, "r:gz") as tar:
-                members = tar.getmembers()
-                iterator = tqdm(members, desc="Extracting files", unit="file") if self.show_progress else members
-                for member in iterator:
-                    # Determine extraction path
-                    if self.output_dir:
-                        # User specified an output directory, extract there
-                        extract_path = self.output_dir
-                        display_name = member.name
+            with self._open_archive() as (tar, raw):
+                # The member count is unknown up front, so progress follows the compressed bytes read
+                progress = tqdm(
+                    total=os.path.getsize(self.tar_path), desc="Extracting files", unit="B", unit_scale=True
+                ) if self.show_progress else None
+                try:
+                    for member in tar:
+                        # Determine extraction path
+                        if self.output_dir:
+                            # User specified an output directory, extract there
+                            extract_path = self.output_dir
+                            display_name = member.name
                         
-                        # Extract and denormalize content
-                        if member.isfile():
-                            file_obj = tar.extractfile(member)
-                            if file_obj:
-                                content = file_obj.read()
-                                denormalized_content = self._denormalize_file_content(content)
+                            # Extract and denormalize content
+                            if member.isfile():
+                                file_obj = tar.extractfile(member)
+                                if file_obj:
+                                    content = file_obj.read()
+                                    denormalized_content = self._denormalize_file_content(content)
                                 
-                                # Write to output directory
-                                output_file_path = os.path.join(extract_path, member.name)
-                                os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+                                    # Write to output directory
+                                    output_file_path = os.path.join(extract_path, member.name)
+                                    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
                                 
-                                with open(output_file_path, 'wb') as f:
-                                    f.write(denormalized_content)
+                                    with open(output_file_path, 'wb') as f:
+                                        f.write(denormalized_content)
                                 
-                                # Restore permissions
-                                os.chmod(output_file_path, member.mode)
+                                    # Restore permissions
+                                    os.chmod(output_file_path, member.mode)
                                 
-                                if self.show_progress:
-                                    tqdm.write(f"Extracting: {display_name}")
+                                    if self.show_progress:
+                                        tqdm.write(f"Extracting: {display_name}")
+                            elif member.islnk():
+                                # Hard link to a member restored earlier in the stream
+                                self._restore_hardlink(
+                                    os.path.join(extract_path, member.linkname),
+                                    os.path.join(extract_path, member.name),
+                                )
+                            else:
+                                # Directory or link - extract normally
+                                tar.extract(member, path=extract_path)
                         else:
-                            # Directory or link - extract normally
-                            tar.extract(member, path=extract_path)
-                    else:
-                        # Denormalize the path to restore to the correct location
-                        actual_path = self._denormalize_path(member.name)
-                        actual_dir = os.path.dirname(actual_path)
+                            # Denormalize the path to restore to the correct location
+                            actual_path = self._denormalize_path(member.name)
+                            actual_dir = os.path.dirname(actual_path)
                         
-                        # Create directory structure if needed
-                        if not os.path.exists(actual_dir):
-                            os.makedirs(actual_dir, exist_ok=True)
+                            # Create directory structure if needed
+                            if not os.path.exists(actual_dir):
+                                os.makedirs(actual_dir, exist_ok=True)
                         
-                        # Show progress info if enabled
-                        if self.show_progress:
-                            tqdm.write(f"Extracting: {member.name} -> {actual_path}")
+                            # Show progress info if enabled
+                            if self.show_progress:
+                                tqdm.write(f"Extracting: {member.name} -> {actual_path}")
                         
-                        # Extract file and denormalize content
-                        if member.isfile():
-                            file_obj = tar.extractfile(member)
-                            if file_obj:
-                                content = file_obj.read()
-                                denormalized_content = self._denormalize_file_content(content)
+                            # Extract file and denormalize content
+                            if member.isfile():
+                                file_obj = tar.extractfile(member)
+                                if file_obj:
+                                    content = file_obj.read()
+                                    denormalized_content = self._denormalize_file_content(content)
                                 
-                                # Write to actual path
-                                with open(actual_path, 'wb') as f:
-                                    f.write(denormalized_content)
+                                    # Write to actual path
+                                    with open(actual_path, 'wb') as f:
+                                        f.write(denormalized_content)
                                 
-                                # Restore permissions
-                                os.chmod(actual_path, member.mode)
-                        else:
-                            # Directory or link - extract normally
-                            original_name = member.name
-                            # Remove the archive prefix to get relative path from root
-                            if actual_path.startswith(os.sep):
-                                member.name = actual_path[1:]  # Remove leading /
+                                    # Restore permissions
+                                    os.chmod(actual_path, member.mode)
+                            elif member.islnk():
+                                # The link target is stored under its normalized name too
+                                self._restore_hardlink(self._denormalize_path(member.linkname), actual_path)
                             else:
-                                member.name = actual_path
+                                # Directory or link - extract normally
+                                original_name = member.name
+                                # Remove the archive prefix to get relative path from root
+                                if actual_path.startswith(os.sep):
+                                    member.name = actual_path[1:]  # Remove leading /
+                                else:
+                                    member.name = actual_path
                             
-                            tar.extract(member, path=os.sep)
+                                tar.extract(member, path=os.sep)
                             
-                            # Restore original name for next iteration
-                            member.name = original_name
-                        
+                                # Restore original name for next iteration
+                                member.name = original_name
+
+                        if progress is not None:
+                            progress.update(raw.tell() - progress.n)
+                finally:
+                    if progress is not None:
+                        progress.close()
+
                 # Success message
                 if self.output_dir:
                     print(Fore.GREEN + f"Extraction completed successfully in '{self.output_dir}'.")
                 else:
                     print(Fore.GREEN + "Extraction completed successfully to absolute paths.")
-        except (tarfile.TarError, OSError, IOError) as e:
+        except ARCHIVE_ERRORS as e:
             print(Fore.RED + f"[ERROR] Extraction failed: {e}")
@@ -23,6 +23,9 @@ class PathExpander:
 
     def expand(self, path: str) -> str:
         """Expand custom and environment variables in the given path."""
+        # Every substitution below starts with '$'; plain paths come back unchanged
+        if "$" not in path:
+            return path
         # Expande variables personalizadas tipo $HOME, $CONFIG_DIR, etc.
         for key, value in self.custom_vars.items():
             path = path.replace(f"${key}", value)
@@ -0,0 +1,21 @@
+"""Module providing the text/binary check shared by the compressor and decompressor"""
+
+# How much of a file is inspected to decide whether it is text
+TEXT_SNIFF_SIZE = 8192
+
+
+def looks_like_text(head: bytes) -> bool:
+    """Return True if head (the start of a file) looks like UTF-8 text.
+
+    The compressor only normalizes home paths in files this accepts, and the
+    decompressor only restores them in such files, so both must use this check.
+    """
+    # If there are null bytes, it's likely binary
+    if b'\0' in head:
+        return False
+    # Try to decode as UTF-8
+    try:
+        head.decode('utf-8')
+        return True
+    except UnicodeDecodeError:
+        return False
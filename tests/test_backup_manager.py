@@ -0,0 +1,45 @@
+"""Archive listing of BackupManager"""
+import os
+import tempfile
+import unittest
+
+from config_saver.lib.backup_mapager.backup_manager import BackupManager
+
+
+def touch(path: str) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb"):
+        pass
+    return path
+
+
+class ListArchivesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.saves = self._tmp.name
+        self.manager = BackupManager(saves_dir=self.saves)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_configs_tree_skips_dotfiles(self) -> None:
+        ts_dir = os.path.join(self.saves, "configs", "app", "20260101-000000")
+        archive = touch(os.path.join(ts_dir, "app-20260101-000000.tar.gz"))
+        touch(os.path.join(ts_dir, ".partial.tar.gz"))
+
+        self.assertEqual(self.manager.list_archives(), [archive])
+
+    @unittest.skipIf(os.geteuid() == 0, "root can read any directory")
+    def test_unreadable_config_dir_is_skipped(self) -> None:
+        configs = os.path.join(self.saves, "configs")
+        archive = touch(os.path.join(configs, "app", "20260101-000000", "app-20260101-000000.tar.gz"))
+        locked = os.path.join(configs, "locked")
+        os.makedirs(locked)
+        os.chmod(locked, 0)
+        self.addCleanup(os.chmod, locked, 0o755)
+
+        self.assertEqual(self.manager.list_archives(), [archive])
+
+
+if __name__ == "__main__":
+    unittest.main()
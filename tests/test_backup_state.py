@@ -0,0 +1,64 @@
+"""Reuse of the previous archive through the recorded BackupState"""
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+from config_saver.lib.backup_mapager.backup_manager import BackupManager
+from config_saver.lib.tar_compressor.tar_compressor import zstandard
+
+
+class ArchiveReuseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = self._tmp.name
+        app = os.path.join(root, "app")
+        os.mkdir(app)
+        with open(os.path.join(app, "app.conf"), "w", encoding="utf-8") as fh:
+            fh.write("level=1\n")
+        self.config = os.path.join(root, "app.yaml")
+        with open(self.config, "w", encoding="utf-8") as fh:
+            fh.write(f'directories:\n  - "{app}"\n')
+        self.first_dir = os.path.join(root, "first")
+        self.second_dir = os.path.join(root, "second")
+        os.mkdir(self.first_dir)
+        os.mkdir(self.second_dir)
+        self.manager = BackupManager(saves_dir=root)
+        self.first = self.compress(self.first_dir, 6)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def compress(
+        self, dest_dir: str, compresslevel: int, suffix: str = ".tar.gz", prev_state_dir: Optional[str] = None
+    ) -> str:
+        return self.manager._compress_yaml_with_state(
+            self.config,
+            os.path.join(dest_dir, "app" + suffix),
+            prev_state_dir=prev_state_dir,
+            compresslevel=compresslevel,
+        )
+
+    def compress_again(self, compresslevel: int, suffix: str = ".tar.gz") -> str:
+        return self.compress(self.second_dir, compresslevel, suffix, prev_state_dir=self.first_dir)
+
+    def test_same_level_reuses_previous_archive(self) -> None:
+        self.assertTrue(os.path.samefile(self.first, self.compress_again(6)))
+
+    def test_other_level_rebuilds_archive(self) -> None:
+        self.assertFalse(os.path.samefile(self.first, self.compress_again(9)))
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_other_codec_rebuilds_archive(self) -> None:
+        self.assertFalse(os.path.samefile(self.first, self.compress_again(6, ".tar.zst")))
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_level_with_same_zstd_level_reuses_archive(self) -> None:
+        # Levels 5 and 6 both compress with zstd level 3
+        first = self.compress(self.first_dir, 6, ".tar.zst")
+
+        self.assertTrue(os.path.samefile(first, self.compress_again(5, ".tar.zst")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""End-to-end checks of the config-saver CLI, run in a subprocess with a scratch HOME"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+def run_cli(home: str, *args: str) -> subprocess.CompletedProcess:
+    """Run `python -m config_saver` with HOME pointing at a scratch directory."""
+    env = dict(os.environ, HOME=home)
+    env.pop("XDG_CACHE_HOME", None)
+    return subprocess.run(
+        [sys.executable, "-m", "config_saver", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+class DirectoryModeValidationTest(unittest.TestCase):
+    def test_invalid_config_exits_with_validation_error(self) -> None:
+        with tempfile.TemporaryDirectory() as home:
+            cfgs = os.path.join(home, "cfgs")
+            os.mkdir(cfgs)
+            with open(os.path.join(cfgs, "good.yaml"), "w", encoding="utf-8") as fh:
+                fh.write(f'directories:\n  - "{home}/missing"\n')
+            with open(os.path.join(cfgs, "bad.yaml"), "w", encoding="utf-8") as fh:
+                fh.write("directories: 5\n")
+
+            result = run_cli(home, "--compress", "--input", cfgs)
+
+            self.assertEqual(result.returncode, 3, result.stderr)
+            self.assertIn("Validation error in configuration:", result.stdout)
+            self.assertNotIn("Traceback", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
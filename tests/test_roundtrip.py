@@ -0,0 +1,142 @@
+"""Compress -> decompress round trips through the CLI"""
+import contextlib
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+from test_cli import run_cli
+
+from config_saver.lib.tar_compressor.tar_decompressor import TarDecompressor
+
+
+class HardLinkRoundTripTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.home = self._tmp.name
+        self.app = os.path.join(self.home, ".config", "app")
+        os.makedirs(self.app)
+        self.first = os.path.join(self.app, "first.conf")
+        self.second = os.path.join(self.app, "second.conf")
+        with open(self.first, "w", encoding="utf-8") as fh:
+            fh.write("shared=1\n")
+        os.link(self.first, self.second)
+        self.config = os.path.join(self.home, "app.yaml")
+        with open(self.config, "w", encoding="utf-8") as fh:
+            fh.write('directories:\n  - "$CONFIG_DIR/app"\n')
+        self.archive = os.path.join(self.home, "app.tar.gz")
+        result = run_cli(self.home, "--compress", "--input", self.config, "--output", self.archive)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def assert_linked_pair(self, first: str, second: str) -> None:
+        for path in (first, second):
+            with open(path, encoding="utf-8") as fh:
+                self.assertEqual(fh.read(), "shared=1\n")
+        self.assertTrue(os.path.samefile(first, second))
+
+    def test_restore_to_absolute_paths(self) -> None:
+        os.unlink(self.first)
+        os.unlink(self.second)
+
+        result = run_cli(self.home, "--decompress", "--input", self.archive)
+
+        self.assertNotIn("[ERROR]", result.stdout)
+        self.assert_linked_pair(self.first, self.second)
+
+    def test_restore_over_existing_files(self) -> None:
+        result = run_cli(self.home, "--decompress", "--input", self.archive)
+
+        self.assertNotIn("[ERROR]", result.stdout)
+        self.assert_linked_pair(self.first, self.second)
+
+    def test_restore_to_output_dir(self) -> None:
+        out = os.path.join(self.home, "out")
+
+        result = run_cli(self.home, "--decompress", "--input", self.archive, "--output", out)
+
+        self.assertNotIn("[ERROR]", result.stdout)
+        restored = os.path.join(out, "home", "user", ".config", "app")
+        self.assert_linked_pair(os.path.join(restored, "first.conf"), os.path.join(restored, "second.conf"))
+
+
+class HardLinkMissingTargetTest(unittest.TestCase):
+    def test_later_members_are_still_restored(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "broken.tar.gz")
+            with tarfile.open(archive, "w:gz") as tar:
+                link = tarfile.TarInfo("home/user/app/second.conf")
+                link.type = tarfile.LNKTYPE
+                link.linkname = "home/user/app/first.conf"
+                tar.addfile(link)
+                data = b"after=1\n"
+                after = tarfile.TarInfo("home/user/app/after.conf")
+                after.size = len(data)
+                tar.addfile(after, io.BytesIO(data))
+            out = os.path.join(tmp, "out")
+            os.makedirs(os.path.join(out, "home", "user", "app"))
+            # An existing file at the link path, whose target never gets restored
+            with open(os.path.join(out, "home", "user", "app", "second.conf"), "w", encoding="utf-8") as fh:
+                fh.write("kept\n")
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stdout):
+                TarDecompressor(archive, output_dir=out).decompress()
+
+            self.assertNotIn("[ERROR]", stdout.getvalue())
+            self.assertIn("[WARNING] Skipping hard link", stdout.getvalue())
+            with open(os.path.join(out, "home", "user", "app", "after.conf"), encoding="utf-8") as fh:
+                self.assertEqual(fh.read(), "after=1\n")
+
+
+class NormalizedLinksRoundTripTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.home = self._tmp.name
+        self.app = os.path.join(self.home, ".config", "app")
+        os.makedirs(self.app)
+        # Every file mentions home, so each one is a normalization candidate
+        names = ("a.conf", "h1.conf", "f1", "f2", "f3", "f4")
+        self.contents = {name: f"path={self.home}/{name}\n" for name in names}
+        for name, content in self.contents.items():
+            with open(os.path.join(self.app, name), "w", encoding="utf-8") as fh:
+                fh.write(content)
+        os.symlink("a.conf", os.path.join(self.app, "lnk"))
+        os.link(os.path.join(self.app, "h1.conf"), os.path.join(self.app, "h2.conf"))
+        config = os.path.join(self.home, "app.yaml")
+        with open(config, "w", encoding="utf-8") as fh:
+            fh.write('directories:\n  - "$CONFIG_DIR/app"\nnormalize_content: true\n')
+        self.archive = os.path.join(self.home, "app.tar.gz")
+        result = run_cli(self.home, "--compress", "--input", config, "--output", self.archive)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_archive_keeps_every_member(self) -> None:
+        with tarfile.open(self.archive) as tar:
+            members = {os.path.basename(m.name): m for m in tar.getmembers()}
+
+        self.assertEqual(set(members), {*self.contents, "lnk", "h2.conf"})
+        self.assertTrue(members["lnk"].issym())
+        self.assertEqual(members["lnk"].linkname, "a.conf")
+
+    def test_restore_to_absolute_paths(self) -> None:
+        for name in os.listdir(self.app):
+            os.unlink(os.path.join(self.app, name))
+
+        result = run_cli(self.home, "--decompress", "--input", self.archive)
+
+        self.assertNotIn("[ERROR]", result.stdout)
+        for name, content in self.contents.items():
+            with open(os.path.join(self.app, name), encoding="utf-8") as fh:
+                self.assertEqual(fh.read(), content)
+        self.assertEqual(os.readlink(os.path.join(self.app, "lnk")), "a.conf")
+        self.assertTrue(os.path.samefile(os.path.join(self.app, "h1.conf"), os.path.join(self.app, "h2.conf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+"""TarCompressor argument checks"""
+import unittest
+
+from config_saver.lib.models.model import Model
+from config_saver.lib.tar_compressor.tar_compressor import TarCompressor
+
+
+class CompressLevelTest(unittest.TestCase):
+    def test_level_outside_1_to_9_is_rejected(self) -> None:
+        model = Model(directories=[])
+        for level in (0, 10, -1):
+            with self.subTest(level=level), self.assertRaises(ValueError):
+                TarCompressor(model, compresslevel=level)
+
+
+if __name__ == "__main__":
+    unittest.main()